@@ -1,30 +1,142 @@
+import asyncio
+import atexit
+import base64
+import collections
+import functools
+import hashlib
+import http.client
+import io
 import json
+import logging
+import logging.handlers
 import os
+import queue
+import random
 import re
 import socket
+import sqlite3
 import sys
 import threading
 import time
-import traceback
 import urllib.error
+import urllib.parse
 import urllib.request
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
+from anki.utils import ids2str
 from aqt import gui_hooks, mw
 from aqt.qt import QAction, QMenu, QMessageBox, QProgressDialog, Qt
 from aqt.utils import showWarning, tooltip
 
-from .config_ui import OpenAIConfigDialog, default_log_file_path, normalize_button, normalize_config
+from .config_ui import (
+    FIELD_PATTERN,
+    OpenAIConfigDialog,
+    default_log_file_path,
+    normalize_button,
+    normalize_config,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _jloads = orjson.loads
+    _jdumps = orjson.dumps
+else:
+    _jloads = json.loads
+
+    def _jdumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+_simdjson_local = threading.local()
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 ADDON_NAME = "OpenAI Card Updater"
 OPENAI_RESPONSES_URL = "https://api.openai.com/v1/responses"
 DEEPSEEK_CHAT_COMPLETIONS_URL = "https://api.deepseek.com/chat/completions"
 MANIFEST_PATH = os.path.join(os.path.dirname(__file__), "manifest.json")
 DEFAULT_REQUEST_TIMEOUT_SECONDS = 90
-RETRYABLE_HTTP_STATUS_CODES = {429, 500, 502, 503, 504}
+DEFAULT_BULK_CONCURRENCY = 4
+DEFAULT_RESPONSE_CACHE_SIZE = 1000
+RESPONSE_CACHE_FILE_NAME = "response_cache.sqlite"
+JSON_WORD_PATTERN = re.compile("json", re.IGNORECASE)
+RETRYABLE_HTTP_STATUS_CODES = {408, 429, 500, 502, 503, 504}
 SINGLE_NOTE_RETRY_ATTEMPTS = 1
-BULK_RETRY_ATTEMPTS = 1
-BULK_RETRY_DELAY_SECONDS = 1.5
+SINGLE_NOTE_AUTO_RETRY_ATTEMPTS = 2
+BULK_RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY_SECONDS = 1.0
+RETRY_MAX_DELAY_SECONDS = 60.0
+CANCEL_POLL_INTERVAL_SECONDS = 0.2
+RATE_LIMIT_MAX_WAITS = 5
+RATE_LIMIT_DEFAULT_WAIT_SECONDS = 5.0
+RATE_LIMIT_MAX_WAIT_SECONDS = 60.0
+ESTIMATED_RESPONSE_TOKENS = 500
+BULK_SAVE_BATCH_SIZE = 50
+NOTE_QUERY_CHUNK_SIZE = 500
+PROGRESS_UPDATE_INTERVAL_SECONDS = 0.1
+
+
+@dataclass(frozen=True)
+class ButtonConfig:
+    """Normalized button settings with whitespace already stripped."""
+
+    # dataclass(slots=True) needs Python 3.10; Anki 2.1.57 ships 3.9.
+    __slots__ = (
+        "name",
+        "tooltip",
+        "provider",
+        "mode",
+        "model",
+        "saved_prompt_id",
+        "saved_prompt_version",
+        "system_prompt",
+        "user_prompt",
+        "field_map",
+        "cache",
+    )
+
+    name: str
+    tooltip: str
+    provider: str
+    mode: str
+    model: str
+    saved_prompt_id: str
+    saved_prompt_version: str
+    system_prompt: str
+    user_prompt: str
+    field_map: dict
+    cache: bool
+
+    @classmethod
+    def from_dict(cls, raw):
+        button = normalize_button(raw)
+        return cls(
+            name=button["name"].strip(),
+            tooltip=button["tooltip"].strip(),
+            provider=button["provider"].strip() or "openai",
+            mode=button["mode"],
+            model=button["model"].strip(),
+            saved_prompt_id=button["saved_prompt_id"].strip(),
+            saved_prompt_version=button["saved_prompt_version"].strip() or "latest",
+            system_prompt=button["system_prompt"],
+            user_prompt=button["user_prompt"],
+            field_map=dict(button["field_map"]),
+            cache=button["cache"],
+        )
 
 
 def _get_config():
@@ -53,24 +165,46 @@ def _log_file_path(config):
     return (config.get("log_file_path") or default_log_file_path()).strip()
 
 
-def _append_error_log(config, message, traceback_text=""):
-    if not _error_file_logging_enabled(config):
-        return
-    path = _log_file_path(config)
-    if not path:
-        return
-    timestamp = datetime.now().astimezone().isoformat(timespec="seconds")
-    lines = [f"{timestamp} [{ADDON_NAME}] ERROR: {message}"]
-    if traceback_text:
-        lines.append(traceback_text.rstrip())
-    try:
-        log_dir = os.path.dirname(path)
-        if log_dir:
-            os.makedirs(log_dir, exist_ok=True)
-        with open(path, "a", encoding="utf-8") as log_file:
-            log_file.write("\n".join(lines) + "\n")
-    except Exception as err:
-        print(f"[{ADDON_NAME}] ERROR: Could not write error log to {path}: {err}")
+class _ConsoleLogHandler(logging.Handler):
+    def emit(self, record):
+        message = record.getMessage()
+        if record.levelno >= logging.ERROR:
+            print(f"[{ADDON_NAME}] ERROR: {message}")
+        else:
+            print(f"[{ADDON_NAME}] {message}")
+
+
+class _ErrorFileLogHandler(logging.Handler):
+    """Appends error records to the log file path carried on each record."""
+
+    def emit(self, record):
+        path = getattr(record, "log_file_path", "")
+        if record.levelno < logging.ERROR or not path:
+            return
+        timestamp = datetime.fromtimestamp(record.created).astimezone().isoformat(timespec="seconds")
+        text = f"{timestamp} [{ADDON_NAME}] ERROR: {record.getMessage()}"
+        try:
+            log_dir = os.path.dirname(path)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as log_file:
+                log_file.write(text.rstrip() + "\n")
+        except Exception as err:
+            print(f"[{ADDON_NAME}] ERROR: Could not write error log to {path}: {err}")
+
+
+_logger = logging.getLogger(ADDON_NAME)
+_logger.setLevel(logging.DEBUG)
+_logger.propagate = False
+if not _logger.handlers:
+    # Console and file output happen on the listener thread, off the request path.
+    _log_queue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(
+        _log_queue, _ConsoleLogHandler(), _ErrorFileLogHandler()
+    )
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    _logger.addHandler(logging.handlers.QueueHandler(_log_queue))
 
 
 def _request_timeout_seconds(config):
@@ -82,18 +216,126 @@ def _request_timeout_seconds(config):
     return max(10, timeout)
 
 
+def _bulk_concurrency(config):
+    raw_concurrency = config.get("bulk_concurrency", DEFAULT_BULK_CONCURRENCY)
+    try:
+        concurrency = int(raw_concurrency)
+    except (TypeError, ValueError):
+        concurrency = DEFAULT_BULK_CONCURRENCY
+    return max(1, min(16, concurrency))
+
+
+def _rate_limits(config):
+    limits = []
+    for key in ("requests_per_minute", "tokens_per_minute"):
+        try:
+            limits.append(max(0, int(config.get(key) or 0)))
+        except (TypeError, ValueError):
+            limits.append(0)
+    return tuple(limits)
+
+
+async def _sleep_unless_cancelled(seconds, cancel_event):
+    """Sleep for up to seconds; return True as soon as cancel_event is set."""
+    deadline = time.monotonic() + seconds
+    while not cancel_event.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(remaining, CANCEL_POLL_INTERVAL_SECONDS))
+    return True
+
+
+class _RateLimiter:
+    """Token bucket pacing one bulk job; a limit of 0 disables that bucket."""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.available_request_capacity = float(requests_per_minute)
+        self.available_token_capacity = float(tokens_per_minute)
+        self.last_update = time.monotonic()
+
+    def _replenish(self):
+        now = time.monotonic()
+        elapsed = now - self.last_update
+        self.last_update = now
+        if self.requests_per_minute:
+            self.available_request_capacity = min(
+                float(self.requests_per_minute),
+                self.available_request_capacity + elapsed * self.requests_per_minute / 60.0,
+            )
+        if self.tokens_per_minute:
+            self.available_token_capacity = min(
+                float(self.tokens_per_minute),
+                self.available_token_capacity + elapsed * self.tokens_per_minute / 60.0,
+            )
+
+    async def acquire(self, tokens, cancel_event):
+        """Wait for capacity; return False if cancel_event was set while waiting."""
+        if self.tokens_per_minute:
+            # A request larger than the whole bucket could otherwise never run.
+            tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            self._replenish()
+            wait_seconds = 0.0
+            if self.requests_per_minute and self.available_request_capacity < 1:
+                wait_seconds = (1 - self.available_request_capacity) * 60.0 / self.requests_per_minute
+            if self.tokens_per_minute and self.available_token_capacity < tokens:
+                wait_seconds = max(
+                    wait_seconds,
+                    (tokens - self.available_token_capacity) * 60.0 / self.tokens_per_minute,
+                )
+            if wait_seconds <= 0:
+                if self.requests_per_minute:
+                    self.available_request_capacity -= 1
+                if self.tokens_per_minute:
+                    self.available_token_capacity -= tokens
+                return True
+            if await _sleep_unless_cancelled(wait_seconds, cancel_event):
+                return False
+
+
+def _estimate_request_tokens(prompt_values):
+    prompt_length = len(prompt_values["system_prompt"]) + len(prompt_values["user_prompt"])
+    return prompt_length // 4 + ESTIMATED_RESPONSE_TOKENS
+
+
+def _retry_after_seconds(err, default=RATE_LIMIT_DEFAULT_WAIT_SECONDS):
+    headers = getattr(err, "headers", None)
+    raw_value = (headers.get("Retry-After") if headers else None) or ""
+    raw_value = raw_value.strip()
+    if not raw_value:
+        return default
+    try:
+        wait_seconds = float(raw_value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(raw_value)
+        except (TypeError, ValueError):
+            return default
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        wait_seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return max(0.0, min(RATE_LIMIT_MAX_WAIT_SECONDS, wait_seconds))
+
+
+def _retry_delay_seconds(err, attempt):
+    retry_after = _retry_after_seconds(err, default=None)
+    if retry_after is not None:
+        return retry_after
+    return min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2**attempt) + random.random()
+
+
 def _log_debug(config, message):
     if _debug_enabled(config):
-        print(f"[{ADDON_NAME}] {message}")
+        _logger.debug(message)
 
 
 def _log_error(config, message, include_traceback=True):
-    print(f"[{ADDON_NAME}] ERROR: {message}")
-    traceback_text = ""
-    if include_traceback and _debug_enabled(config) and sys.exc_info()[0] is not None:
-        traceback_text = traceback.format_exc()
-        traceback.print_exc()
-    _append_error_log(config, message, traceback_text)
+    exc_info = include_traceback and _debug_enabled(config) and sys.exc_info()[0] is not None
+    log_file_path = _log_file_path(config) if _error_file_logging_enabled(config) else ""
+    _logger.error(message, exc_info=exc_info, extra={"log_file_path": log_file_path})
 
 
 def _provider_label(provider):
@@ -128,29 +370,73 @@ def _get_provider_api_key(config, provider):
     return ""
 
 
+def _escape_format_text(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_template(template):
+    """Convert {{Field}} placeholders into positional str.format fields."""
+    parts = []
+    field_names = []
+    last_end = 0
+    for match in FIELD_PATTERN.finditer(template):
+        parts.append(_escape_format_text(template[last_end : match.start()]))
+        parts.append(f"{{{len(field_names)}}}")
+        field_names.append(match.group(1).strip())
+        last_end = match.end()
+    parts.append(_escape_format_text(template[last_end:]))
+    return "".join(parts), tuple(field_names)
+
+
 def _expand_fields(template, note, config):
     if not template:
         return ""
-
-    def replace(match):
-        field_name = match.group(1).strip()
+    if "{{" not in template:
+        return template
+
+    format_string, field_names = _compile_template(template)
+    if not field_names:
+        return template
+    values = []
+    for field_name in field_names:
         if field_name in note:
-            return note[field_name]
-        _log_debug(config, f"Prompt field not found in note: {field_name}")
-        return ""
-
-    return re.sub(r"{{(.*?)}}", replace, template)
+            values.append(note[field_name])
+        else:
+            _log_debug(config, f"Prompt field not found in note: {field_name}")
+            values.append("")
+    return format_string.format(*values)
 
 
 def _ensure_json_instruction(system_text, user_text):
-    user_lower = (user_text or "").lower()
-    if "json" in user_lower:
-        return system_text, user_text
     if not user_text:
         return system_text, "Return output as JSON."
+    if JSON_WORD_PATTERN.search(user_text):
+        return system_text, user_text
     return system_text, f"{user_text}\n\nReturn output as JSON."
 
 
+def _parse_response_lazy(body):
+    if simdjson is None:
+        return _jloads(body)
+    # simdjson parsers are not thread-safe and hold one document at a time.
+    parser = getattr(_simdjson_local, "parser", None)
+    if parser is not None:
+        try:
+            return parser.parse(body)
+        except RuntimeError:
+            pass
+    parser = _simdjson_local.parser = simdjson.Parser()
+    return parser.parse(body)
+
+
+def _json_text(value):
+    mini = getattr(value, "mini", None)
+    if mini is not None:
+        return mini.decode("utf-8")
+    return _jdumps(value).decode("utf-8")
+
+
 def _extract_output_text(response_json):
     output_items = response_json.get("output") or []
     texts = []
@@ -164,42 +450,84 @@ def _extract_output_text(response_json):
             elif ctype == "output_json":
                 content_json = content.get("json")
                 if content_json is not None:
-                    return json.dumps(content_json)
+                    return _json_text(content_json)
     combined = "\n".join(t for t in texts if t).strip()
     return combined
 
 
+def _stream_output_text(stream):
+    """Build only the response's message items instead of the whole document."""
+    output_items = [
+        item
+        for item in ijson.items(stream, "output.item", use_float=True)
+        if item.get("type") == "message"
+    ]
+    return _extract_output_text({"output": output_items})
+
+
+def _extract_deepseek_output_text(response_json):
+    choices = response_json.get("choices") or []
+    if not choices:
+        return ""
+    message = choices[0].get("message") or {}
+    return (message.get("content") or "").strip()
+
+
 def _read_http_error_body(err):
+    # The error body can only be read once; keep it for later callers.
+    body = getattr(err, "_addon_error_body", None)
+    if body is not None:
+        return body
     try:
-        return err.read().decode("utf-8", errors="replace")
+        body = err.read().decode("utf-8", errors="replace")
     except Exception:
-        return ""
+        body = ""
+    try:
+        err._addon_error_body = body
+    except AttributeError:
+        pass
+    return body
 
 
-def _extract_api_error_message(body):
+def _extract_api_error(body):
     if not body:
-        return ""
+        return {}
     try:
-        payload = json.loads(body)
+        payload = _jloads(body)
     except Exception:
-        return ""
-    error = payload.get("error")
+        return {}
+    error = payload.get("error") if isinstance(payload, dict) else None
     if not isinstance(error, dict):
-        return ""
-    message = error.get("message")
+        return {}
+    return error
+
+
+def _extract_api_error_message(body):
+    message = _extract_api_error(body).get("message")
     if not message:
         return ""
     return str(message).strip()
 
 
+def _is_quota_error(err):
+    """Return True for a 429 caused by an exhausted quota rather than rate limiting."""
+    if not isinstance(err, urllib.error.HTTPError) or err.code != 429:
+        return False
+    error = _extract_api_error(_read_http_error_body(err))
+    return error.get("code") == "insufficient_quota" or error.get("type") == "insufficient_quota"
+
+
 def _classify_provider_error(provider, err, timeout_seconds):
     provider_label = _provider_label(provider)
     if isinstance(err, urllib.error.HTTPError):
         body = _read_http_error_body(err)
         api_message = _extract_api_error_message(body)
-        retryable = err.code in RETRYABLE_HTTP_STATUS_CODES
+        quota_exceeded = _is_quota_error(err)
+        retryable = err.code in RETRYABLE_HTTP_STATUS_CODES and not quota_exceeded
         user_message = f"{provider_label} request failed (HTTP {err.code})."
-        if err.code == 429:
+        if quota_exceeded:
+            user_message = f"{provider_label} quota exceeded. Check your plan and billing details."
+        elif err.code == 429:
             user_message = f"{provider_label} rate limit reached (HTTP 429)."
         elif retryable:
             user_message = f"{provider_label} temporary server error (HTTP {err.code})."
@@ -214,7 +542,7 @@ def _classify_provider_error(provider, err, timeout_seconds):
             "user_message": user_message,
             "details": body,
             "log_message": log_message,
-            "category": "http",
+            "category": "quota" if quota_exceeded else "http",
         }
 
     if isinstance(err, (TimeoutError, socket.timeout)):
@@ -226,7 +554,7 @@ def _classify_provider_error(provider, err, timeout_seconds):
             "category": "timeout",
         }
 
-    if isinstance(err, urllib.error.URLError):
+    if isinstance(err, (urllib.error.URLError, ConnectionError)):
         reason = str(getattr(err, "reason", err))
         return {
             "retryable": True,
@@ -245,6 +573,12 @@ def _classify_provider_error(provider, err, timeout_seconds):
     }
 
 
+def _is_retryable_error(err):
+    if isinstance(err, urllib.error.HTTPError):
+        return err.code in RETRYABLE_HTTP_STATUS_CODES and not _is_quota_error(err)
+    return isinstance(err, (TimeoutError, socket.timeout, urllib.error.URLError, ConnectionError))
+
+
 def _show_provider_error(parent, title, error_info, debug_enabled, offer_retry):
     if callable(parent):
         try:
@@ -275,49 +609,228 @@ def _show_provider_error(parent, title, error_info, debug_enabled, offer_retry):
     return False
 
 
-def _call_openai(config, button_cfg, prompt_values, timeout_seconds):
-    mode = button_cfg.get("mode") or "saved_prompt"
-    model = (button_cfg.get("model") or "").strip()
-    payload = {"text": {"format": {"type": "json_object"}}}
-
-    if mode == "saved_prompt":
-        prompt_id = (button_cfg.get("saved_prompt_id") or "").strip()
-        prompt_version = (button_cfg.get("saved_prompt_version") or "latest").strip()
-        payload["prompt"] = {"id": prompt_id}
-        if prompt_version and prompt_version.lower() != "latest":
-            payload["prompt"]["version"] = prompt_version
-        if prompt_values["user_prompt"]:
-            payload["input"] = prompt_values["user_prompt"]
-    elif mode == "manual":
-        if not model:
-            raise ValueError("Model is required for manual mode.")
-        payload["model"] = model
-        if prompt_values["system_prompt"]:
-            payload["instructions"] = prompt_values["system_prompt"]
-        if prompt_values["user_prompt"]:
-            payload["input"] = prompt_values["user_prompt"]
-    else:
-        raise ValueError(f"Mode '{mode}' is not supported.")
+class _KeepAliveSession:
+    """Reuses one HTTPS connection per host and thread across provider requests."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self.refresh_proxies()
+
+    def refresh_proxies(self):
+        """Re-read the system proxy settings, as urlopen does for each request."""
+        # Same proxy sources urlopen uses: environment, macOS settings, Windows registry.
+        proxies = urllib.request.getproxies()
+        with self._lock:
+            self._proxies = proxies
+            self._proxy_by_host = {}
+
+    def _proxy_for(self, hostname):
+        """Return the parsed HTTPS proxy URL for hostname, or None for a direct connection."""
+        with self._lock:
+            if hostname in self._proxy_by_host:
+                return self._proxy_by_host[hostname]
+            proxy_by_host = self._proxy_by_host
+            proxy_url = self._proxies.get("https")
+        proxy = None
+        if proxy_url and not urllib.request.proxy_bypass(hostname):
+            if "://" not in proxy_url:
+                proxy_url = f"http://{proxy_url}"
+            proxy = urllib.parse.urlsplit(proxy_url)
+        with self._lock:
+            proxy_by_host[hostname] = proxy
+        return proxy
+
+    def _new_connection(self, host, proxy, timeout_seconds):
+        if proxy is None:
+            return http.client.HTTPSConnection(host, timeout=timeout_seconds)
+        # Like urllib, a proxy URL without a port uses the connection's default port.
+        conn = http.client.HTTPSConnection(proxy.hostname, proxy.port, timeout=timeout_seconds)
+        tunnel_headers = {}
+        if proxy.username:
+            credentials = (
+                f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or '')}"
+            )
+            token = base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+            tunnel_headers["Proxy-Authorization"] = f"Basic {token}"
+        conn.set_tunnel(host, headers=tunnel_headers)
+        return conn
+
+    def _connection(self, host, proxy, timeout_seconds):
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        key = (host, proxy)
+        conn = connections.get(key)
+        if conn is None:
+            # Drop a connection opened through a proxy that is no longer in use.
+            for stale_key in [k for k in connections if k[0] == host]:
+                self._discard(stale_key)
+            conn = self._new_connection(host, proxy, timeout_seconds)
+            connections[key] = conn
+            with self._lock:
+                self._connections.append(conn)
+        else:
+            conn.timeout = timeout_seconds
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout_seconds)
+        return conn
+
+    def _discard(self, key):
+        connections = getattr(self._local, "connections", None) or {}
+        conn = connections.pop(key, None)
+        if conn is None:
+            return
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+    def _post_with_urlopen(self, url, data, headers, timeout_seconds, read_body):
+        request = urllib.request.Request(url, data=data, headers=headers, method="POST")
+        with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
+            if read_body is None:
+                return response.read()
+            return read_body(response)
+
+    def post(self, url, data, headers, timeout_seconds, read_body=None):
+        parts = urllib.parse.urlsplit(url)
+        proxy = self._proxy_for(parts.hostname)
+        if proxy is not None and proxy.scheme != "http":
+            # http.client can only tunnel through plain HTTP proxies.
+            return self._post_with_urlopen(url, data, headers, timeout_seconds, read_body)
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+        key = (parts.netloc, proxy)
+        for attempt in range(2):
+            conn = self._connection(parts.netloc, proxy, timeout_seconds)
+            reused = conn.sock is not None
+            try:
+                conn.request("POST", path, body=data, headers=headers)
+                response = conn.getresponse()
+                if read_body is None or response.status >= 400:
+                    body = response.read()
+                else:
+                    body = read_body(response)
+                    # Drain whatever the reader skipped so the socket can be reused.
+                    response.read()
+            except (socket.timeout, TimeoutError):
+                self._discard(key)
+                raise
+            except ConnectionError:
+                self._discard(key)
+                # The server may close an idle keep-alive socket between requests.
+                if reused and attempt == 0:
+                    continue
+                raise
+            except OSError as err:
+                self._discard(key)
+                raise urllib.error.URLError(err) from err
+            except Exception:
+                self._discard(key)
+                raise
+            if response.will_close:
+                self._discard(key)
+            if response.status >= 400:
+                raise urllib.error.HTTPError(
+                    url, response.status, response.reason, response.headers, io.BytesIO(body)
+                )
+            return body
+
+    def close(self):
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+        for conn in connections:
+            conn.close()
+
 
-    if mode == "saved_prompt" and model:
-        payload["model"] = model
+_http_session = _KeepAliveSession()
 
-    data = json.dumps(payload).encode("utf-8")
-    headers = {
+
+def _request_headers(api_key):
+    return {
         "Content-Type": "application/json",
-        "Authorization": f"Bearer {_get_provider_api_key(config, 'openai')}",
+        "Authorization": f"Bearer {api_key}",
+        "Connection": "keep-alive",
     }
-    req = urllib.request.Request(OPENAI_RESPONSES_URL, data=data, headers=headers, method="POST")
 
-    _log_debug(config, f"OpenAI request payload: {payload}")
-    with urllib.request.urlopen(req, timeout=timeout_seconds) as resp:
-        body = resp.read().decode("utf-8")
-        _log_debug(config, f"OpenAI response body: {body}")
-        return json.loads(body)
+
+def _prepare_request(button_cfg):
+    """Serialize the part of a provider request that is the same for every note."""
+    provider = button_cfg.provider
+    mode = button_cfg.mode
+    model = button_cfg.model
+
+    if provider == "deepseek":
+        url = DEEPSEEK_CHAT_COMPLETIONS_URL
+        static_payload = {
+            "model": model,
+            "response_format": {"type": "json_object"},
+            "stream": False,
+        }
+    elif provider == "openai":
+        url = OPENAI_RESPONSES_URL
+        static_payload = {"text": {"format": {"type": "json_object"}}}
+        if mode == "saved_prompt":
+            static_payload["prompt"] = {"id": button_cfg.saved_prompt_id}
+            if button_cfg.saved_prompt_version.lower() != "latest":
+                static_payload["prompt"]["version"] = button_cfg.saved_prompt_version
+        elif mode == "manual":
+            if not model:
+                raise ValueError("Model is required for manual mode.")
+        else:
+            raise ValueError(f"Mode '{mode}' is not supported.")
+        if model:
+            static_payload["model"] = model
+    else:
+        raise ValueError(f"Provider '{provider}' is not supported.")
+
+    return {
+        "provider": provider,
+        "mode": mode,
+        "url": url,
+        # Drop the closing brace so per-note keys can be appended.
+        "body_prefix": _jdumps(static_payload)[:-1],
+    }
+
+
+def _request_body(body_prefix, dynamic_payload):
+    if not dynamic_payload:
+        return body_prefix + b"}"
+    return body_prefix + b"," + _jdumps(dynamic_payload)[1:]
+
+
+def _call_openai(config, request, prompt_values, timeout_seconds, headers, session=None):
+    dynamic_payload = {}
+    if request["mode"] == "manual" and prompt_values["system_prompt"]:
+        dynamic_payload["instructions"] = prompt_values["system_prompt"]
+    if prompt_values["user_prompt"]:
+        dynamic_payload["input"] = prompt_values["user_prompt"]
+    data = _request_body(request["body_prefix"], dynamic_payload)
+
+    session = session or _http_session
+    # ijson's event loop is slower than a C parser over the full body, so only
+    # stream when neither simdjson nor orjson is available.
+    if ijson is not None and simdjson is None and orjson is None and not _debug_enabled(config):
+        return session.post(
+            request["url"],
+            data,
+            headers,
+            timeout_seconds,
+            read_body=_stream_output_text,
+        )
+    if _debug_enabled(config):
+        _log_debug(config, f"OpenAI request payload: {data.decode('utf-8')}")
+    body = session.post(request["url"], data, headers, timeout_seconds)
+    if _debug_enabled(config):
+        _log_debug(config, f"OpenAI response body: {body.decode('utf-8', errors='replace')}")
+    return _extract_output_text(_parse_response_lazy(body))
 
 
-def _call_deepseek(config, button_cfg, prompt_values, timeout_seconds):
-    model = (button_cfg.get("model") or "").strip()
+def _call_deepseek(config, request, prompt_values, timeout_seconds, headers, session=None):
     messages = []
     if prompt_values["system_prompt"]:
         messages.append({"role": "system", "content": prompt_values["system_prompt"]})
@@ -325,83 +838,81 @@ def _call_deepseek(config, button_cfg, prompt_values, timeout_seconds):
         messages.append({"role": "user", "content": prompt_values["user_prompt"]})
     if not messages:
         raise ValueError("At least one prompt message is required.")
+    data = _request_body(request["body_prefix"], {"messages": messages})
 
-    payload = {
-        "model": model,
-        "messages": messages,
-        "response_format": {"type": "json_object"},
-        "stream": False,
-    }
-    data = json.dumps(payload).encode("utf-8")
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {_get_provider_api_key(config, 'deepseek')}",
-    }
-    req = urllib.request.Request(
-        DEEPSEEK_CHAT_COMPLETIONS_URL,
-        data=data,
-        headers=headers,
-        method="POST",
-    )
+    if _debug_enabled(config):
+        _log_debug(config, f"DeepSeek request payload: {data.decode('utf-8')}")
+    body = (session or _http_session).post(request["url"], data, headers, timeout_seconds)
+    if _debug_enabled(config):
+        _log_debug(config, f"DeepSeek response body: {body.decode('utf-8', errors='replace')}")
+    return _extract_deepseek_output_text(_jloads(body))
 
-    _log_debug(config, f"DeepSeek request payload: {payload}")
-    with urllib.request.urlopen(req, timeout=timeout_seconds) as resp:
-        body = resp.read().decode("utf-8")
-        _log_debug(config, f"DeepSeek response body: {body}")
-        return json.loads(body)
 
+def _call_provider(config, request, prompt_values, timeout_seconds, headers, session=None):
+    if request["provider"] == "deepseek":
+        return _call_deepseek(config, request, prompt_values, timeout_seconds, headers, session)
+    return _call_openai(config, request, prompt_values, timeout_seconds, headers, session)
 
-def _call_provider(config, button_cfg, prompt_values, timeout_seconds):
-    provider = button_cfg.get("provider") or "openai"
-    if provider == "deepseek":
-        return _call_deepseek(config, button_cfg, prompt_values, timeout_seconds)
-    if provider == "openai":
-        return _call_openai(config, button_cfg, prompt_values, timeout_seconds)
-    raise ValueError(f"Provider '{provider}' is not supported.")
+
+def _decode_output(output_text):
+    if not output_text:
+        return None
+    try:
+        return _jloads(output_text)
+    except json.JSONDecodeError:
+        return None
 
 
-def _extract_provider_output_text(button_cfg, response_json):
-    provider = button_cfg.get("provider") or "openai"
-    if provider == "deepseek":
-        choices = response_json.get("choices") or []
-        if not choices:
-            return ""
-        message = choices[0].get("message") or {}
-        return (message.get("content") or "").strip()
-    return _extract_output_text(response_json)
+def _call_provider_and_decode(config, request, prompt_values, timeout_seconds, headers, session=None):
+    output_text = _call_provider(config, request, prompt_values, timeout_seconds, headers, session)
+    return output_text, _decode_output(output_text)
+
+
+def _call_provider_with_retry(
+    config, request, prompt_values, timeout_seconds, headers, max_retries=BULK_RETRY_ATTEMPTS
+):
+    _http_session.refresh_proxies()
+    for attempt in range(max_retries + 1):
+        try:
+            return _call_provider(config, request, prompt_values, timeout_seconds, headers)
+        except Exception as err:
+            if attempt >= max_retries or not _is_retryable_error(err):
+                raise
+            delay_seconds = _retry_delay_seconds(err, attempt)
+            _log_debug(config, f"Retrying after {delay_seconds:.1f}s due to error: {err}")
+            time.sleep(delay_seconds)
 
 
 def _validate_button_request(button_cfg):
-    provider = button_cfg.get("provider") or "openai"
-    mode = button_cfg.get("mode") or "saved_prompt"
+    provider = button_cfg.provider
+    mode = button_cfg.mode
 
     if provider == "openai":
-        if mode == "saved_prompt" and not (button_cfg.get("saved_prompt_id") or "").strip():
+        if mode == "saved_prompt" and not button_cfg.saved_prompt_id:
             return "Button is missing saved_prompt_id."
-        if mode == "manual" and not (button_cfg.get("model") or "").strip():
+        if mode == "manual" and not button_cfg.model:
             return "Button is missing model for manual mode."
         return None
 
     if provider == "deepseek":
         if mode != "manual":
             return "DeepSeek currently supports manual mode only."
-        if not (button_cfg.get("model") or "").strip():
+        if not button_cfg.model:
             return "Button is missing model for manual mode."
         return None
 
     return f"Provider '{provider}' is not supported."
 
 
-def _handle_response(editor, note_id, button_cfg, response_json, config):
-    provider = button_cfg.get("provider") or "openai"
+def _handle_response(editor, note_id, button_cfg, output_text, config):
+    provider = button_cfg.provider
     provider_label = _provider_label(provider)
-    output_text = _extract_provider_output_text(button_cfg, response_json)
     if not output_text:
         showWarning(f"{provider_label} returned no text output.")
         return
 
     try:
-        result = json.loads(output_text)
+        result = _jloads(output_text)
     except json.JSONDecodeError:
         _log_error(config, "Failed to parse JSON response.")
         showWarning(f"{provider_label} response was not valid JSON.")
@@ -422,20 +933,22 @@ def _handle_response(editor, note_id, button_cfg, response_json, config):
         return
 
     note = editor.note
-    field_map = button_cfg.get("field_map") or {}
+    field_map = button_cfg.field_map
+    present_keys = field_map.keys() & result.keys()
+    missing_keys = [key for key in field_map if key not in present_keys]
+    missing_fields = list(
+        dict.fromkeys(
+            field_name
+            for response_key, field_name in field_map.items()
+            if response_key in present_keys and field_name not in note
+        )
+    )
     updated_fields = []
-    missing_fields = []
-    missing_keys = []
 
     for response_key, field_name in field_map.items():
-        if response_key not in result:
-            missing_keys.append(response_key)
-            continue
-        if field_name not in note:
-            missing_fields.append(field_name)
-            continue
-        note[field_name] = str(result[response_key])
-        updated_fields.append(field_name)
+        if response_key in present_keys and field_name in note:
+            note[field_name] = str(result[response_key])
+            updated_fields.append(field_name)
 
     def after_save():
         try:
@@ -470,8 +983,7 @@ def _handle_response(editor, note_id, button_cfg, response_json, config):
 
 def _run_button(editor, button_cfg):
     config = _get_config()
-    button_cfg = normalize_button(button_cfg)
-    provider = button_cfg.get("provider") or "openai"
+    provider = button_cfg.provider
     provider_label = _provider_label(provider)
     api_key = _get_provider_api_key(config, provider)
     if not api_key:
@@ -489,8 +1001,8 @@ def _run_button(editor, button_cfg):
         showWarning("No note is loaded in the editor.")
         return
 
-    system_prompt = _expand_fields(button_cfg.get("system_prompt") or "", editor.note, config)
-    user_prompt = _expand_fields(button_cfg.get("user_prompt") or "", editor.note, config)
+    system_prompt = _expand_fields(button_cfg.system_prompt, editor.note, config)
+    user_prompt = _expand_fields(button_cfg.user_prompt, editor.note, config)
     system_prompt, user_prompt = _ensure_json_instruction(system_prompt, user_prompt)
     validation_error = _validate_button_request(button_cfg)
     if validation_error:
@@ -498,21 +1010,25 @@ def _run_button(editor, button_cfg):
         return
     note_id = editor.note.id
     timeout_seconds = _request_timeout_seconds(config)
+    headers = _request_headers(api_key)
+    request = _prepare_request(button_cfg)
 
     def start_request(attempt):
         def task():
-            return _call_provider(
+            return _call_provider_with_retry(
                 config,
-                button_cfg,
+                request,
                 {"system_prompt": system_prompt, "user_prompt": user_prompt},
                 timeout_seconds,
+                headers,
+                max_retries=SINGLE_NOTE_AUTO_RETRY_ATTEMPTS,
             )
 
         def on_done(future):
             mw.progress.finish()
 
             try:
-                response_json = future.result()
+                output_text = future.result()
             except Exception as err:
                 error_info = _classify_provider_error(provider, err, timeout_seconds)
                 _log_error(config, error_info["log_message"], include_traceback=False)
@@ -536,7 +1052,7 @@ def _run_button(editor, button_cfg):
                     )
                     return
 
-            _handle_response(editor, note_id, button_cfg, response_json, config)
+            _handle_response(editor, note_id, button_cfg, output_text, config)
 
         mw.progress.start(
             label=f"{provider_label} update in progress... (timeout {timeout_seconds}s)",
@@ -547,10 +1063,148 @@ def _run_button(editor, button_cfg):
     start_request(1)
 
 
+def _response_cache_size(config):
+    try:
+        return max(0, int(config.get("response_cache_size", DEFAULT_RESPONSE_CACHE_SIZE)))
+    except (TypeError, ValueError):
+        return DEFAULT_RESPONSE_CACHE_SIZE
+
+
+def _response_cache_path():
+    addon_dir = mw.addonManager.addonsFolder(__name__)
+    return os.path.join(addon_dir, "user_files", RESPONSE_CACHE_FILE_NAME)
+
+
+def _response_cache_key(button_cfg, system_prompt, user_prompt):
+    key_parts = (
+        button_cfg.provider,
+        button_cfg.mode,
+        button_cfg.saved_prompt_id,
+        button_cfg.saved_prompt_version,
+        button_cfg.model,
+        system_prompt,
+        user_prompt,
+    )
+    return hashlib.blake2b("\0".join(key_parts).encode("utf-8"), digest_size=16).digest()
+
+
+def _response_cache_storable(button_cfg):
+    """Return False for saved prompts pinned to "latest", which can change on OpenAI's side."""
+    return not (
+        button_cfg.mode == "saved_prompt" and button_cfg.saved_prompt_version.lower() == "latest"
+    )
+
+
+class _ResponseCache:
+    """LRU cache of provider output text, persisted to an SQLite file."""
+
+    def __init__(self):
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _connection(self):
+        if self._db is None:
+            path = _response_cache_path()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key BLOB PRIMARY KEY, output_text TEXT NOT NULL, last_used REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(responses)")}
+            if "last_used" not in columns:
+                self._db.execute(
+                    "ALTER TABLE responses ADD COLUMN last_used REAL NOT NULL DEFAULT 0"
+                )
+        return self._db
+
+    def _touch(self, key):
+        self._connection().execute(
+            "UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key)
+        )
+
+    def _remember(self, key, output_text, max_size):
+        self._entries[key] = output_text
+        self._entries.move_to_end(key)
+        while len(self._entries) > max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, key, max_size):
+        with self._lock:
+            output_text = self._entries.get(key)
+            if output_text is not None:
+                self._entries.move_to_end(key)
+                self._touch(key)
+                return output_text
+            row = self._connection().execute(
+                "SELECT output_text FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[0], max_size)
+            self._touch(key)
+            return row[0]
+
+    def put(self, key, output_text, max_size):
+        with self._lock:
+            self._remember(key, output_text, max_size)
+            self._connection().execute(
+                "INSERT OR REPLACE INTO responses (key, output_text, last_used) VALUES (?, ?, ?)",
+                (key, output_text, time.time()),
+            )
+
+    def commit(self, max_size):
+        with self._lock:
+            if self._db is None:
+                return
+            # Keep the most recently used entries, matching the in-memory LRU.
+            self._db.execute(
+                "DELETE FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses ORDER BY last_used DESC LIMIT ?)",
+                (max_size,),
+            )
+            self._db.commit()
+
+
+_response_cache = _ResponseCache()
+
+
+def _note_type_ids(note_ids):
+    note_type_ids = {}
+    for start in range(0, len(note_ids), NOTE_QUERY_CHUNK_SIZE):
+        chunk = note_ids[start : start + NOTE_QUERY_CHUNK_SIZE]
+        for note_id, note_type_id in mw.col.db.all(
+            f"select id, mid from notes where id in {ids2str(chunk)}"
+        ):
+            note_type_ids[note_id] = note_type_id
+    return note_type_ids
+
+
+def _note_type_field_names(note_type_id):
+    note_type = mw.col.models.get(note_type_id) or {}
+    return frozenset(field["name"] for field in note_type.get("flds", []))
+
+
+def _save_notes(notes):
+    if not notes:
+        return
+    update_notes = getattr(mw.col, "update_notes", None)
+    if update_notes is not None:
+        # Like note.flush(), don't add an undo entry per background batch.
+        try:
+            update_notes(notes, skip_undo_entry=True)
+            return
+        except TypeError:
+            # skip_undo_entry was added in Anki 23.10.
+            pass
+    for note in notes:
+        note.flush()
+
+
 def _run_button_bulk(browser, button_cfg):
     config = _get_config()
-    button_cfg = normalize_button(button_cfg)
-    provider = button_cfg.get("provider") or "openai"
+    provider = button_cfg.provider
     provider_label = _provider_label(provider)
     api_key = _get_provider_api_key(config, provider)
     if not api_key:
@@ -573,9 +1227,11 @@ def _run_button_bulk(browser, button_cfg):
         tooltip("No notes selected.", period=3000)
         return
 
-    field_map = button_cfg.get("field_map") or {}
+    field_map = button_cfg.field_map
     total = len(note_ids)
     timeout_seconds = _request_timeout_seconds(config)
+    headers = _request_headers(api_key)
+    request = _prepare_request(button_cfg)
     cancel_event = threading.Event()
     progress_dialog = QProgressDialog(f"{provider_label} bulk update...", "Cancel", 0, total, browser)
     progress_dialog.setWindowTitle(ADDON_NAME)
@@ -593,39 +1249,117 @@ def _run_button_bulk(browser, button_cfg):
             "cancelled": False,
             "retried": 0,
             "timed_out": 0,
+            "rate_limited": 0,
+            "cached": 0,
         }
-        for idx, note_id in enumerate(note_ids, start=1):
-            if cancel_event.is_set():
-                result["cancelled"] = True
-                break
-
-            note = mw.col.get_note(note_id)
+        concurrency = _bulk_concurrency(config)
+        system_template = button_cfg.system_prompt
+        user_template = button_cfg.user_prompt
+        field_items = tuple(field_map.items())
+        field_keys = frozenset(field_map)
+        required_fields = tuple(field_map.values())
+        note_type_ids = _note_type_ids(note_ids) if field_items else {}
+        note_fields_by_type = {}
+        cache_size = _response_cache_size(config) if button_cfg.cache else 0
+        # Responses to a "latest" saved prompt are only shared within this run.
+        store_responses = bool(cache_size) and _response_cache_storable(button_cfg)
+        limiter = _RateLimiter(*_rate_limits(config))
+        completed = 0
+        last_progress_update = 0.0
+        progress_flush = None
+        pending_notes = []
+        # Futures of provider requests still in flight, keyed by cache key.
+        inflight_requests = {}
+
+        def flush_progress():
+            nonlocal progress_flush
+            progress_flush = None
+            update_progress()
+
+        def update_progress():
+            nonlocal last_progress_update, progress_flush
+            now = time.monotonic()
+            wait_seconds = last_progress_update + PROGRESS_UPDATE_INTERVAL_SECONDS - now
+            if completed < total and wait_seconds > 0:
+                # Send the latest state once the interval has passed instead of dropping it.
+                if progress_flush is None:
+                    progress_flush = asyncio.get_running_loop().call_later(
+                        wait_seconds, flush_progress
+                    )
+                return
+            if progress_flush is not None:
+                progress_flush.cancel()
+                progress_flush = None
+            last_progress_update = now
+            label = f"{provider_label} update {completed}/{total}"
+            if result["rate_limited"]:
+                label += f" (rate limited: {result['rate_limited']})"
+            mw.taskman.run_on_main(
+                lambda i=completed, text=label: (
+                    progress_dialog.setLabelText(text),
+                    progress_dialog.setValue(i),
+                )
+            )
 
-            if not field_map:
-                result["skipped"] += 1
-                continue
+        def report_progress():
+            nonlocal completed
+            completed += 1
+            update_progress()
 
-            missing_fields = [f for f in field_map.values() if f not in note]
-            if missing_fields:
-                _log_debug(config, f"Skipping note {note_id}: missing fields {missing_fields}")
-                result["skipped"] += 1
-                continue
+        session = _KeepAliveSession()
 
-            system_prompt = _expand_fields(button_cfg.get("system_prompt") or "", note, config)
-            user_prompt = _expand_fields(button_cfg.get("user_prompt") or "", note, config)
-            system_prompt, user_prompt = _ensure_json_instruction(system_prompt, user_prompt)
+        def cache_get(cache_key):
+            try:
+                return _response_cache.get(cache_key, cache_size)
+            except (sqlite3.Error, OSError):
+                _log_error(config, "Could not read the response cache.")
+                return None
 
-            response_json = None
-            for attempt in range(BULK_RETRY_ATTEMPTS + 1):
+        def cache_put(cache_key, output_text):
+            try:
+                _response_cache.put(cache_key, output_text, cache_size)
+            except (sqlite3.Error, OSError):
+                _log_error(config, "Could not write the response cache.")
+
+        async def request_note(executor, note_id, prompt_values):
+            loop = asyncio.get_running_loop()
+            estimated_tokens = _estimate_request_tokens(prompt_values)
+            rate_limit_waits = 0
+            attempt = 0
+            while attempt <= BULK_RETRY_ATTEMPTS:
+                if cancel_event.is_set() or not await limiter.acquire(estimated_tokens, cancel_event):
+                    result["cancelled"] = True
+                    return None
                 try:
-                    response_json = _call_provider(
+                    return await loop.run_in_executor(
+                        executor,
+                        _call_provider_and_decode,
                         config,
-                        button_cfg,
-                        {"system_prompt": system_prompt, "user_prompt": user_prompt},
+                        request,
+                        prompt_values,
                         timeout_seconds,
+                        headers,
+                        session,
                     )
-                    break
                 except Exception as err:
+                    if (
+                        isinstance(err, urllib.error.HTTPError)
+                        and err.code == 429
+                        and rate_limit_waits < RATE_LIMIT_MAX_WAITS
+                        and not _is_quota_error(err)
+                    ):
+                        rate_limit_waits += 1
+                        result["rate_limited"] += 1
+                        update_progress()
+                        wait_seconds = _retry_after_seconds(err)
+                        _log_debug(
+                            config,
+                            f"Rate limited on note {note_id}; waiting {wait_seconds:.1f}s before retrying.",
+                        )
+                        if await _sleep_unless_cancelled(wait_seconds, cancel_event):
+                            result["cancelled"] = True
+                            return None
+                        continue
                     error_info = _classify_provider_error(provider, err, timeout_seconds)
                     _log_error(
                         config,
@@ -633,65 +1367,163 @@ def _run_button_bulk(browser, button_cfg):
                         include_traceback=False,
                     )
                     if attempt < BULK_RETRY_ATTEMPTS and error_info["retryable"]:
+                        delay_seconds = _retry_delay_seconds(err, attempt)
+                        attempt += 1
                         result["retried"] += 1
                         _log_debug(
                             config,
-                            f"Retrying note {note_id} after {BULK_RETRY_DELAY_SECONDS}s due to {error_info['category']} error.",
+                            f"Retrying note {note_id} after {delay_seconds:.1f}s due to {error_info['category']} error.",
                         )
-                        time.sleep(BULK_RETRY_DELAY_SECONDS)
+                        if await _sleep_unless_cancelled(delay_seconds, cancel_event):
+                            result["cancelled"] = True
+                            return None
                         continue
                     if error_info["category"] == "timeout":
                         result["timed_out"] += 1
                     result["failed"] += 1
-                    response_json = None
-                    break
+                    return None
+            return None
+
+        async def process_note(executor, semaphore, note_id):
+            # Coroutines run on the task thread, so collection reads and writes
+            # stay there; only the blocking HTTP calls go to the executor.
+            async with semaphore:
+                if cancel_event.is_set():
+                    result["cancelled"] = True
+                    return
 
-            if response_json is None:
-                continue
+                if not field_items:
+                    result["skipped"] += 1
+                    return
 
-            output_text = _extract_provider_output_text(button_cfg, response_json)
-            if not output_text:
-                _log_error(config, f"No output text for note {note_id}.")
-                result["failed"] += 1
-                continue
+                note_type_id = note_type_ids.get(note_id)
+                if note_type_id is None:
+                    _log_debug(config, f"Skipping note {note_id}: note no longer exists.")
+                    result["skipped"] += 1
+                    return
+                note_fields = note_fields_by_type.get(note_type_id)
+                if note_fields is None:
+                    note_fields = note_fields_by_type[note_type_id] = _note_type_field_names(
+                        note_type_id
+                    )
 
-            try:
-                response = json.loads(output_text)
-            except json.JSONDecodeError:
-                _log_error(config, f"Invalid JSON for note {note_id}.")
-                result["failed"] += 1
-                continue
-
-            if response.get("success") is not True:
-                _log_debug(config, f"{provider_label} success=false for note {note_id}.")
-                result["failed"] += 1
-                continue
-
-            updated_any = False
-            missing_keys = []
-            for response_key, field_name in field_map.items():
-                if response_key not in response:
-                    missing_keys.append(response_key)
-                    continue
-                note[field_name] = str(response[response_key])
-                updated_any = True
+                missing_fields = [f for f in required_fields if f not in note_fields]
+                if missing_fields:
+                    _log_debug(config, f"Skipping note {note_id}: missing fields {missing_fields}")
+                    result["skipped"] += 1
+                    return
 
-            if missing_keys:
-                _log_debug(config, f"Missing response keys for note {note_id}: {missing_keys}")
+                note = mw.col.get_note(note_id)
+
+                system_prompt = _expand_fields(system_template, note, config)
+                user_prompt = _expand_fields(user_template, note, config)
+                system_prompt, user_prompt = _ensure_json_instruction(system_prompt, user_prompt)
+
+                cache_key = None
+                output_text = None
+                if cache_size:
+                    cache_key = _response_cache_key(button_cfg, system_prompt, user_prompt)
+                    if store_responses:
+                        output_text = cache_get(cache_key)
+                if output_text is not None:
+                    result["cached"] += 1
+                    response = _decode_output(output_text)
+                elif cache_key in inflight_requests:
+                    # Another note with the same prompts is already being
+                    # requested; reuse its response instead of sending a duplicate.
+                    outcome = await inflight_requests[cache_key]
+                    if outcome is None:
+                        if cancel_event.is_set():
+                            result["cancelled"] = True
+                        else:
+                            _log_debug(config, f"Shared request for note {note_id} failed.")
+                            result["failed"] += 1
+                        return
+                    result["cached"] += 1
+                    output_text, response = outcome
+                else:
+                    request_future = None
+                    if cache_key is not None:
+                        request_future = asyncio.get_running_loop().create_future()
+                        inflight_requests[cache_key] = request_future
+                    outcome = None
+                    try:
+                        # Response parsing runs in the executor too, so it overlaps
+                        # with other notes' network waits.
+                        outcome = await request_note(
+                            executor,
+                            note_id,
+                            {"system_prompt": system_prompt, "user_prompt": user_prompt},
+                        )
+                    finally:
+                        if request_future is not None:
+                            del inflight_requests[cache_key]
+                            request_future.set_result(outcome)
+                    if outcome is None:
+                        return
+                    output_text, response = outcome
+
+                if not output_text:
+                    _log_error(config, f"No output text for note {note_id}.")
+                    result["failed"] += 1
+                    return
 
-            if updated_any:
-                note.flush()
-                result["updated"] += 1
-            else:
-                result["skipped"] += 1
+                if response is None:
+                    _log_error(config, f"Invalid JSON for note {note_id}.")
+                    result["failed"] += 1
+                    return
 
-            mw.taskman.run_on_main(
-                lambda i=idx: (
-                    progress_dialog.setLabelText(f"{provider_label} update {i}/{total}"),
-                    progress_dialog.setValue(i),
-                )
+                if response.get("success") is not True:
+                    _log_debug(config, f"{provider_label} success=false for note {note_id}.")
+                    result["failed"] += 1
+                    return
+
+                if store_responses:
+                    cache_put(cache_key, output_text)
+
+                # Mapped note fields were checked against the note type above.
+                present_keys = field_keys & response.keys()
+                for response_key, field_name in field_items:
+                    if response_key in present_keys:
+                        note[field_name] = str(response[response_key])
+
+                if len(present_keys) < len(field_keys):
+                    missing_keys = [key for key, _ in field_items if key not in present_keys]
+                    _log_debug(config, f"Missing response keys for note {note_id}: {missing_keys}")
+
+                if present_keys:
+                    pending_notes.append(note)
+                    result["updated"] += 1
+                    if len(pending_notes) >= BULK_SAVE_BATCH_SIZE:
+                        _save_notes(pending_notes)
+                        pending_notes.clear()
+                else:
+                    result["skipped"] += 1
+
+        async def process_note_with_progress(executor, semaphore, note_id):
+            try:
+                await process_note(executor, semaphore, note_id)
+            finally:
+                if not cancel_event.is_set():
+                    report_progress()
+
+        async def run_all(executor):
+            semaphore = asyncio.Semaphore(concurrency)
+            await asyncio.gather(
+                *(process_note_with_progress(executor, semaphore, note_id) for note_id in note_ids)
             )
 
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                asyncio.run(run_all(executor))
+        finally:
+            session.close()
+            _save_notes(pending_notes)
+            if store_responses:
+                try:
+                    _response_cache.commit(cache_size)
+                except (sqlite3.Error, OSError):
+                    _log_error(config, "Could not save the response cache.")
         return result
 
     def on_done(future):
@@ -717,6 +1549,10 @@ def _run_button_bulk(browser, button_cfg):
         )
         if result["timed_out"]:
             summary += f", Timeouts: {result['timed_out']}"
+        if result["rate_limited"]:
+            summary += f", Rate limited: {result['rate_limited']}"
+        if result["cached"]:
+            summary += f", Cached: {result['cached']}"
         if result.get("cancelled"):
             summary = f"Cancelled. {summary}"
         tooltip(summary, period=4000)
@@ -726,10 +1562,10 @@ def _run_button_bulk(browser, button_cfg):
 
 def _add_editor_buttons(buttons, editor):
     config = _get_config()
-    button_cfgs = config.get("buttons") or []
+    button_cfgs = [ButtonConfig.from_dict(button) for button in config.get("buttons") or []]
     for idx, button_cfg in enumerate(button_cfgs):
-        label = (button_cfg.get("name") or "").strip() or "OpenAI"
-        tooltip = (button_cfg.get("tooltip") or "").strip() or label
+        label = button_cfg.name or "OpenAI"
+        tooltip = button_cfg.tooltip or label
         cmd = f"openai_card_updater_{idx}"
 
         def handler(ed=editor, cfg=button_cfg):
@@ -755,8 +1591,9 @@ def _setup_browser_menu(browser):
         action.setEnabled(False)
         menu.addAction(action)
     else:
-        for idx, button_cfg in enumerate(button_cfgs):
-            label = (button_cfg.get("name") or f"Button {idx + 1}").strip()
+        for idx, button in enumerate(button_cfgs):
+            button_cfg = ButtonConfig.from_dict(button)
+            label = button_cfg.name or f"Button {idx + 1}"
             action = QAction(label, browser)
             action.triggered.connect(
                 lambda checked=False, cfg=button_cfg, br=browser: _run_button_bulk(br, cfg)
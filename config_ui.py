@@ -61,6 +61,7 @@ BUTTON_DEFAULTS = {
     "system_prompt": "",
     "user_prompt": "",
     "field_map": {},
+    "cache": False,
 }
 
 TOP_LEVEL_DEFAULTS = {
@@ -72,6 +73,10 @@ TOP_LEVEL_DEFAULTS = {
     "log_errors_to_file": True,
     "log_file_path": "",
     "request_timeout_seconds": 90,
+    "bulk_concurrency": 4,
+    "requests_per_minute": 0,
+    "tokens_per_minute": 0,
+    "response_cache_size": 1000,
     "buttons": [],
 }
 
@@ -120,6 +125,7 @@ def normalize_button(raw):
             str(response_key): str(field_name)
             for response_key, field_name in field_map.items()
         },
+        "cache": bool(raw.get("cache", BUTTON_DEFAULTS["cache"])),
     }
 
     if button["provider"] != "openai":
@@ -148,6 +154,30 @@ def normalize_config(raw):
     except (TypeError, ValueError):
         timeout = TOP_LEVEL_DEFAULTS["request_timeout_seconds"]
 
+    try:
+        bulk_concurrency = int(raw.get("bulk_concurrency", TOP_LEVEL_DEFAULTS["bulk_concurrency"]))
+    except (TypeError, ValueError):
+        bulk_concurrency = TOP_LEVEL_DEFAULTS["bulk_concurrency"]
+
+    try:
+        requests_per_minute = int(
+            raw.get("requests_per_minute", TOP_LEVEL_DEFAULTS["requests_per_minute"])
+        )
+    except (TypeError, ValueError):
+        requests_per_minute = TOP_LEVEL_DEFAULTS["requests_per_minute"]
+
+    try:
+        tokens_per_minute = int(raw.get("tokens_per_minute", TOP_LEVEL_DEFAULTS["tokens_per_minute"]))
+    except (TypeError, ValueError):
+        tokens_per_minute = TOP_LEVEL_DEFAULTS["tokens_per_minute"]
+
+    try:
+        response_cache_size = int(
+            raw.get("response_cache_size", TOP_LEVEL_DEFAULTS["response_cache_size"])
+        )
+    except (TypeError, ValueError):
+        response_cache_size = TOP_LEVEL_DEFAULTS["response_cache_size"]
+
     buttons = raw.get("buttons")
     if not isinstance(buttons, list):
         buttons = []
@@ -163,6 +193,10 @@ def normalize_config(raw):
         ),
         "log_file_path": str(raw.get("log_file_path") or ""),
         "request_timeout_seconds": max(10, min(300, timeout)),
+        "bulk_concurrency": max(1, min(16, bulk_concurrency)),
+        "requests_per_minute": max(0, min(100000, requests_per_minute)),
+        "tokens_per_minute": max(0, min(100000000, tokens_per_minute)),
+        "response_cache_size": max(0, min(100000, response_cache_size)),
         "buttons": [normalize_button(button) for button in buttons],
     }
 
@@ -178,6 +212,10 @@ def exportable_config(config):
         "log_errors_to_file": normalized["log_errors_to_file"],
         "log_file_path": normalized["log_file_path"],
         "request_timeout_seconds": normalized["request_timeout_seconds"],
+        "bulk_concurrency": normalized["bulk_concurrency"],
+        "requests_per_minute": normalized["requests_per_minute"],
+        "tokens_per_minute": normalized["tokens_per_minute"],
+        "response_cache_size": normalized["response_cache_size"],
         "providers": {},
         "buttons": [exportable_button(button) for button in normalized["buttons"]],
     }
@@ -456,6 +494,34 @@ class OpenAIConfigDialog(QDialog):
         self.request_timeout_input.setMaximum(300)
         self.request_timeout_input.setSuffix(" s")
         global_form.addRow("Request Timeout", self.request_timeout_input)
+        self.bulk_concurrency_input = QSpinBox()
+        self.bulk_concurrency_input.setMinimum(1)
+        self.bulk_concurrency_input.setMaximum(16)
+        global_form.addRow("Bulk Concurrency", self.bulk_concurrency_input)
+        bulk_concurrency_helper = QLabel("Maximum number of requests in flight during a bulk update.")
+        bulk_concurrency_helper.setWordWrap(True)
+        global_form.addRow("", bulk_concurrency_helper)
+        self.requests_per_minute_input = QSpinBox()
+        self.requests_per_minute_input.setMinimum(0)
+        self.requests_per_minute_input.setMaximum(100000)
+        self.requests_per_minute_input.setSpecialValueText("Unlimited")
+        global_form.addRow("Requests / Minute", self.requests_per_minute_input)
+        self.tokens_per_minute_input = QSpinBox()
+        self.tokens_per_minute_input.setMinimum(0)
+        self.tokens_per_minute_input.setMaximum(100000000)
+        self.tokens_per_minute_input.setSingleStep(1000)
+        self.tokens_per_minute_input.setSpecialValueText("Unlimited")
+        global_form.addRow("Tokens / Minute", self.tokens_per_minute_input)
+        rate_limit_helper = QLabel(
+            "Bulk updates pace requests to stay under these limits. Set them to your provider tier; 0 disables the limit."
+        )
+        rate_limit_helper.setWordWrap(True)
+        global_form.addRow("", rate_limit_helper)
+        self.response_cache_size_input = QSpinBox()
+        self.response_cache_size_input.setMinimum(0)
+        self.response_cache_size_input.setMaximum(100000)
+        self.response_cache_size_input.setSpecialValueText("Disabled")
+        global_form.addRow("Response Cache Size", self.response_cache_size_input)
         right_layout.addWidget(global_group)
 
         details_group = QGroupBox("Button Details")
@@ -475,6 +541,8 @@ class OpenAIConfigDialog(QDialog):
         details_form.addRow("Tooltip", self.tooltip_input)
         details_form.addRow("Provider", self.provider_input)
         details_form.addRow("Mode", self.mode_input)
+        self.cache_checkbox = QCheckBox("Reuse responses for identical prompts in bulk updates")
+        details_form.addRow("", self.cache_checkbox)
         right_layout.addWidget(details_group)
 
         prompt_group = QGroupBox("Prompt Configuration")
@@ -720,6 +788,14 @@ class OpenAIConfigDialog(QDialog):
         self.request_timeout_input.setValue(
             int(self.working_config.get("request_timeout_seconds", 90))
         )
+        self.bulk_concurrency_input.setValue(int(self.working_config.get("bulk_concurrency", 4)))
+        self.requests_per_minute_input.setValue(
+            int(self.working_config.get("requests_per_minute", 0))
+        )
+        self.tokens_per_minute_input.setValue(int(self.working_config.get("tokens_per_minute", 0)))
+        self.response_cache_size_input.setValue(
+            int(self.working_config.get("response_cache_size", 1000))
+        )
 
     def _refresh_button_list(self):
         self.button_list.blockSignals(True)
@@ -745,6 +821,7 @@ class OpenAIConfigDialog(QDialog):
         self.model_input.clear()
         self.system_prompt_input.clear()
         self.user_prompt_input.clear()
+        self.cache_checkbox.setChecked(False)
         self._clear_mapping_rows()
         self._update_prompt_mode_ui()
 
@@ -763,6 +840,7 @@ class OpenAIConfigDialog(QDialog):
         button["system_prompt"] = self.system_prompt_input.toPlainText()
         button["user_prompt"] = self.user_prompt_input.toPlainText()
         button["field_map"] = self._mapping_rows_to_dict()
+        button["cache"] = self.cache_checkbox.isChecked()
         self.working_config["buttons"][self.current_button_index] = normalize_button(button)
         self._update_list_item(self.current_button_index)
 
@@ -783,6 +861,7 @@ class OpenAIConfigDialog(QDialog):
         self.model_input.setText(button["model"])
         self.system_prompt_input.setPlainText(button["system_prompt"])
         self.user_prompt_input.setPlainText(button["user_prompt"])
+        self.cache_checkbox.setChecked(button["cache"])
         self._load_mapping_rows(button["field_map"])
         self._set_button_editor_enabled(True)
         self._update_prompt_mode_ui()
@@ -918,6 +997,10 @@ class OpenAIConfigDialog(QDialog):
             "log_errors_to_file": self.log_errors_to_file_checkbox.isChecked(),
             "log_file_path": self.log_file_path_input.text().strip(),
             "request_timeout_seconds": self.request_timeout_input.value(),
+            "bulk_concurrency": self.bulk_concurrency_input.value(),
+            "requests_per_minute": self.requests_per_minute_input.value(),
+            "tokens_per_minute": self.tokens_per_minute_input.value(),
+            "response_cache_size": self.response_cache_size_input.value(),
             "buttons": [normalize_button(button) for button in self.working_config["buttons"]],
         }
 
@@ -1202,6 +1285,10 @@ class OpenAIConfigDialog(QDialog):
                 "providers": current_providers,
                 "debug": imported_config["debug"],
                 "request_timeout_seconds": imported_config["request_timeout_seconds"],
+                "bulk_concurrency": imported_config["bulk_concurrency"],
+                "requests_per_minute": imported_config["requests_per_minute"],
+                "tokens_per_minute": imported_config["tokens_per_minute"],
+                "response_cache_size": imported_config["response_cache_size"],
                 "buttons": imported_buttons,
             }
         else:
@@ -1209,6 +1296,10 @@ class OpenAIConfigDialog(QDialog):
                 "providers": current_providers,
                 "debug": imported_config["debug"],
                 "request_timeout_seconds": imported_config["request_timeout_seconds"],
+                "bulk_concurrency": imported_config["bulk_concurrency"],
+                "requests_per_minute": imported_config["requests_per_minute"],
+                "tokens_per_minute": imported_config["tokens_per_minute"],
+                "response_cache_size": imported_config["response_cache_size"],
                 "buttons": current_config["buttons"] + imported_buttons,
             }
 